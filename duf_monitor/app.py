@@ -7,9 +7,11 @@ Works standalone (psutil) or wraps duf's JSON output for consistency.
 """
 
 import asyncio
+import concurrent.futures
 import json
 import os
 import platform
+import random
 import sqlite3
 import subprocess
 import sys
@@ -19,7 +21,7 @@ from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 try:
@@ -28,6 +30,12 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 app = FastAPI(title="duf-monitor", version="1.0.0")
 
 static_dir = Path(__file__).parent / "static"
@@ -38,15 +46,120 @@ DB_PATH = os.environ.get("DUF_DB_PATH", str(Path(__file__).parent / "duf_monitor
 POLL_INTERVAL = int(os.environ.get("DUF_POLL_INTERVAL", "300"))  # seconds
 ALERT_THRESHOLD = int(os.environ.get("DUF_ALERT_THRESHOLD", "90"))  # percent
 WEBHOOK_URL = os.environ.get("DUF_WEBHOOK_URL", "")
+RETENTION_DAYS = int(os.environ.get("DUF_RETENTION_DAYS", "7"))  # days of raw snapshots to keep
 HOSTNAME = platform.node()
+PARTITIONS_TTL = 60  # seconds to reuse the parsed mount table; bounds how long a new mount goes unseen
+CHECKPOINT_INTERVAL = 600  # seconds between explicit WAL checkpoints
+RETENTION_INTERVAL = 86400  # seconds between retention rollups
+
+BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB", "EB")
+
+# Mountpoints reported when neither psutil nor duf is available
+DEMO_MOUNTS = ("/", "/home", "/var", "/tmp", "/boot", "/data")
 
 # Connected WebSocket clients for real-time updates
 ws_clients: set[WebSocket] = set()
 
+# Cached psutil.disk_partitions() result as (monotonic timestamp, partitions, st_dev per mountpoint)
+_partitions_cache: tuple[float, list, tuple] = (0.0, [], ())
+
+
+# Column order of the row tuples returned by get_history() and fetch_alerts()
+HISTORY_COLUMNS = ("timestamp", "usage_percent", "used_bytes", "total_bytes")
+ALERT_COLUMNS = ("id", "timestamp", "hostname", "mountpoint", "usage_percent", "threshold", "acknowledged")
+
+# Hot statements, kept as constants so every call hits the same entry in the
+# connection's prepared-statement cache.
+SQL_INSERT_SNAPSHOT = """
+    INSERT INTO disk_snapshots
+        (timestamp, hostname, mountpoint, device, fstype, total_bytes, used_bytes, free_bytes, usage_percent)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Raises an alert for every row of the snapshot just written that is over the threshold
+SQL_INSERT_ALERTS = """
+    INSERT INTO alerts (timestamp, hostname, mountpoint, usage_percent, threshold)
+    SELECT timestamp, hostname, mountpoint, usage_percent, ?
+    FROM disk_snapshots
+    WHERE timestamp = ? AND usage_percent >= ?
+"""
+SQL_COUNT_HISTORY = "SELECT COUNT(*) FROM disk_snapshots WHERE mountpoint = ? AND timestamp > ?"
+SQL_HISTORY_RAW = """
+    SELECT timestamp, usage_percent, used_bytes, total_bytes
+    FROM disk_snapshots
+    WHERE mountpoint = ? AND timestamp > ?
+    ORDER BY timestamp
+"""
+# M4 downsampling: keep the first, last, min and max row of each time bucket
+SQL_HISTORY_M4 = """
+    SELECT timestamp, usage_percent, used_bytes, total_bytes
+    FROM (
+        SELECT timestamp, usage_percent, used_bytes, total_bytes,
+               ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY timestamp) AS rn_first,
+               ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY timestamp DESC) AS rn_last,
+               ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY usage_percent, timestamp) AS rn_min,
+               ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY usage_percent DESC, timestamp) AS rn_max
+        FROM (
+            SELECT timestamp, usage_percent, used_bytes, total_bytes,
+                   CAST((julianday(timestamp) - julianday(?)) * ? AS INTEGER) AS bucket
+            FROM disk_snapshots
+            WHERE mountpoint = ? AND timestamp > ?
+        )
+    )
+    WHERE 1 IN (rn_first, rn_last, rn_min, rn_max)
+    ORDER BY timestamp
+"""
+SQL_ROLLUP_DAILY = """
+    INSERT OR REPLACE INTO disk_snapshots_daily
+        (day, hostname, mountpoint, samples, avg_usage_percent, min_usage_percent,
+         max_usage_percent, max_used_bytes, total_bytes)
+    SELECT date(timestamp), hostname, mountpoint, COUNT(*), AVG(usage_percent), MIN(usage_percent),
+           MAX(usage_percent), MAX(used_bytes), MAX(total_bytes)
+    FROM disk_snapshots
+    WHERE timestamp < ?
+    GROUP BY 1, 2, 3
+"""
+# One row per rolled-up day, shaped like HISTORY_COLUMNS using the daily peak
+SQL_HISTORY_DAILY = """
+    SELECT day || 'T00:00:00+00:00', max_usage_percent, max_used_bytes, total_bytes
+    FROM disk_snapshots_daily
+    WHERE mountpoint = ? AND day > ?
+    ORDER BY day
+"""
+SQL_PRUNE_SNAPSHOTS = "DELETE FROM disk_snapshots WHERE timestamp < ?"
+SQL_RECENT_ALERTS = """
+    SELECT id, timestamp, hostname, mountpoint, usage_percent, threshold, acknowledged
+    FROM alerts
+    ORDER BY id DESC
+    LIMIT ?
+"""
+SQL_ACK_ALERT = "UPDATE alerts SET acknowledged = 1 WHERE id = ? AND acknowledged = 0"
+SQL_ALERT_EXISTS = "SELECT 1 FROM alerts WHERE id = ?"
+
+
+async def run_db(fn, *args):
+    """Run a blocking database function on the database thread."""
+    return await asyncio.get_running_loop().run_in_executor(app.state.db_executor, fn, *args)
+
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL")
+def open_db() -> sqlite3.Connection:
+    """Open the long-lived database connection and apply tuning PRAGMAs once."""
+    conn = sqlite3.connect(
+        DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=256
+    )
+    conn.executescript("""
+        -- Only takes effect on a new database, so it must precede journal_mode
+        PRAGMA auto_vacuum=INCREMENTAL;
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-20000;
+        PRAGMA wal_autocheckpoint=100;
+    """)
+    return conn
+
+
+def init_db(conn: sqlite3.Connection):
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS disk_snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,20 +182,94 @@ def init_db():
             threshold REAL NOT NULL,
             acknowledged INTEGER DEFAULT 0
         );
+        CREATE TABLE IF NOT EXISTS disk_snapshots_daily (
+            day TEXT NOT NULL,
+            hostname TEXT NOT NULL,
+            mountpoint TEXT NOT NULL,
+            samples INTEGER NOT NULL,
+            avg_usage_percent REAL NOT NULL,
+            min_usage_percent REAL NOT NULL,
+            max_usage_percent REAL NOT NULL,
+            max_used_bytes INTEGER NOT NULL,
+            total_bytes INTEGER NOT NULL,
+            PRIMARY KEY (day, hostname, mountpoint)
+        );
         CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON disk_snapshots(timestamp);
-        CREATE INDEX IF NOT EXISTS idx_snapshots_mount ON disk_snapshots(mountpoint);
         CREATE INDEX IF NOT EXISTS idx_snapshots_host ON disk_snapshots(hostname);
+        -- Covers get_history(): seek by mountpoint, walk timestamps in order
+        CREATE INDEX IF NOT EXISTS idx_snapshots_mount_ts_cover
+            ON disk_snapshots(mountpoint, timestamp, usage_percent, used_bytes, total_bytes);
+        DROP INDEX IF EXISTS idx_snapshots_mount;
+        ANALYZE;
     """)
-    conn.commit()
-    conn.close()
 
 
-def get_disk_usage() -> list[dict]:
-    """Get current disk usage from psutil or duf."""
+def warm_statements(conn: sqlite3.Connection):
+    """Prepare the hot read statements once so the first requests skip parsing."""
+    conn.execute(SQL_COUNT_HISTORY, ("", "")).fetchall()
+    conn.execute(SQL_HISTORY_RAW, ("", "")).fetchall()
+    conn.execute(SQL_HISTORY_M4, ("", 1, "", "")).fetchall()
+    conn.execute(SQL_HISTORY_DAILY, ("", "")).fetchall()
+    conn.execute(SQL_RECENT_ALERTS, (0,)).fetchall()
+
+
+def dumps(obj) -> bytes:
+    """Serialise to compact JSON bytes, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def cache_current(disks: list[dict], ts: str) -> bytes:
+    """Encode the current-usage payload and keep it in app.state for reuse.
+
+    The same bytes are served by /api/current and broadcast as the WebSocket update.
+    """
+    payload = dumps({
+        "type": "update",
+        "hostname": HOSTNAME,
+        "timestamp": ts,
+        "disks": disks,
+        "alert_threshold": ALERT_THRESHOLD,
+    })
+    app.state.last_payload = payload
+    return payload
+
+
+def mount_devices(parts: list) -> tuple:
+    """Return the st_dev of each partition's mountpoint, or None where it can't be stat'ed."""
+    devs = []
+    for part in parts:
+        try:
+            devs.append(os.stat(part.mountpoint).st_dev)
+        except OSError:
+            devs.append(None)
+    return tuple(devs)
+
+
+def get_partitions(refresh: bool = False) -> list:
+    """Return psutil's partition list, re-reading the mount table when it may be stale.
+
+    The cached list is reused for up to PARTITIONS_TTL seconds, but only while
+    every mountpoint still reports the device it had when the list was read,
+    so an unmount (which exposes the parent filesystem) is picked up at once.
+    ``refresh`` skips the cache and always re-reads the mount table.
+    """
+    global _partitions_cache
+    ts, parts, devs = _partitions_cache
+    now = time.monotonic()
+    if refresh or not parts or now - ts > PARTITIONS_TTL or mount_devices(parts) != devs:
+        parts = psutil.disk_partitions(all=False)
+        _partitions_cache = (now, parts, mount_devices(parts))
+    return parts
+
+
+def get_disk_usage(refresh_partitions: bool = False) -> list[dict]:
+    """Get current disk usage from psutil or duf, optionally bypassing the partition cache."""
     disks = []
 
     if HAS_PSUTIL:
-        for part in psutil.disk_partitions(all=False):
+        for part in get_partitions(refresh_partitions):
             try:
                 usage = psutil.disk_usage(part.mountpoint)
                 disks.append({
@@ -123,16 +310,14 @@ def get_disk_usage() -> list[dict]:
 
     # Fallback: generate demo data if nothing available
     if not disks:
-        import random
-        mounts = ["/", "/home", "/var", "/tmp", "/boot", "/data"]
-        for m in mounts:
-            total = random.randint(50, 2000) * (1024 ** 3)
+        for i, m in enumerate(DEMO_MOUNTS):
+            total = random.randint(50, 2000) << 30
             pct = random.uniform(15, 95)
             used = int(total * pct / 100)
             disks.append({
                 "hostname": HOSTNAME,
                 "mountpoint": m,
-                "device": f"/dev/sd{'abcdef'[mounts.index(m)]}1",
+                "device": f"/dev/sd{'abcdef'[i]}1",
                 "fstype": "ext4",
                 "total_bytes": total,
                 "used_bytes": used,
@@ -145,51 +330,100 @@ def get_disk_usage() -> list[dict]:
 
 def save_snapshot(disks: list[dict]):
     """Save disk usage snapshot to database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = app.state.db
     ts = datetime.now(timezone.utc).isoformat()
-    for d in disks:
-        conn.execute(
-            """INSERT INTO disk_snapshots
-               (timestamp, hostname, mountpoint, device, fstype, total_bytes, used_bytes, free_bytes, usage_percent)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (ts, d["hostname"], d["mountpoint"], d["device"], d["fstype"],
-             d["total_bytes"], d["used_bytes"], d["free_bytes"], d["usage_percent"]),
-        )
+    rows = [
+        (ts, d["hostname"], d["mountpoint"], d["device"], d["fstype"],
+         d["total_bytes"], d["used_bytes"], d["free_bytes"], d["usage_percent"])
+        for d in disks
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(SQL_INSERT_SNAPSHOT, rows)
+        conn.execute(SQL_INSERT_ALERTS, (ALERT_THRESHOLD, ts, ALERT_THRESHOLD))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
 
-        # Check alerts
-        if d["usage_percent"] >= ALERT_THRESHOLD:
-            conn.execute(
-                "INSERT INTO alerts (timestamp, hostname, mountpoint, usage_percent, threshold) VALUES (?, ?, ?, ?, ?)",
-                (ts, d["hostname"], d["mountpoint"], d["usage_percent"], ALERT_THRESHOLD),
-            )
 
-    conn.commit()
-    conn.close()
+def get_history(mountpoint: str, hours: int = 24, bins: int = 500) -> list[tuple]:
+    """Get usage history for a mountpoint, M4-downsampled to at most 4 rows per bin.
 
+    Each of the ``bins`` equal-width time buckets keeps its first, last,
+    minimum and maximum usage row, which preserves the shape of a line chart
+    drawn at ``bins`` pixels wide. Windows that already fit in ``4 * bins``
+    rows are returned raw. Rows are tuples ordered as HISTORY_COLUMNS.
 
-def get_history(mountpoint: str, hours: int = 24) -> list[dict]:
-    """Get usage history for a mountpoint."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    Days whose raw rows were already rolled up are filled in from
+    disk_snapshots_daily, one peak row per day. Only days starting after the
+    window cutoff are included, so no point precedes the requested window.
+    """
+    conn = app.state.db
     cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-    rows = conn.execute(
-        """SELECT timestamp, usage_percent, used_bytes, total_bytes
-           FROM disk_snapshots
-           WHERE mountpoint = ? AND timestamp > ?
-           ORDER BY timestamp""",
-        (mountpoint, cutoff),
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    # The rollup removes a day's raw rows as it writes its daily row, so the two never overlap
+    daily = conn.execute(SQL_HISTORY_DAILY, (mountpoint, cutoff[:10])).fetchall()
+    count = conn.execute(SQL_COUNT_HISTORY, (mountpoint, cutoff)).fetchone()[0]
+    if count == 0:
+        return daily
+    if count <= bins * 4:
+        rows = conn.execute(SQL_HISTORY_RAW, (mountpoint, cutoff)).fetchall()
+    else:
+        rows = conn.execute(
+            SQL_HISTORY_M4, (cutoff, bins * 24 / hours, mountpoint, cutoff)
+        ).fetchall()
+    return daily + rows
+
+
+def fetch_alerts(limit: int = 50) -> list[tuple]:
+    """Get the most recent alerts, newest first, as tuples ordered as ALERT_COLUMNS."""
+    return app.state.db.execute(SQL_RECENT_ALERTS, (limit,)).fetchall()
+
+
+def mark_acknowledged(alert_id: int) -> bool:
+    """Mark an alert as acknowledged. Returns False if no such alert exists."""
+    conn = app.state.db
+    if conn.execute(SQL_ACK_ALERT, (alert_id,)).rowcount:
+        return True
+    # Nothing updated: either already acknowledged or unknown
+    return conn.execute(SQL_ALERT_EXISTS, (alert_id,)).fetchone() is not None
+
+
+def apply_retention():
+    """Roll snapshots older than RETENTION_DAYS up into daily aggregates, drop the raw rows and re-tune."""
+    conn = app.state.db
+    # Midnight UTC, so only whole days are rolled up
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).date().isoformat()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(SQL_ROLLUP_DAILY, (cutoff,))
+        conn.execute(SQL_PRUNE_SNAPSHOTS, (cutoff,))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    # executescript() steps the pragma to completion; execute() frees one page per step
+    conn.executescript("PRAGMA incremental_vacuum;")
+    # Refresh planner statistics where the table has changed enough to matter
+    conn.executescript("PRAGMA optimize;")
+
+
+def checkpoint_db():
+    """Fold the WAL back into the database file and truncate it."""
+    app.state.db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+
+def close_db():
+    """Close the shared database connection."""
+    app.state.db.executescript("PRAGMA optimize;")
+    app.state.db.close()
 
 
 def format_bytes(b: int) -> str:
     """Format bytes to human-readable."""
-    for unit in ["B", "KB", "MB", "GB", "TB", "PB"]:
-        if abs(b) < 1024:
-            return f"{b:.1f} {unit}"
-        b /= 1024
-    return f"{b:.1f} EB"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    idx = min((max(int(abs(b)), 1).bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+    return f"{b / (1 << (idx * 10)):.1f} {BYTE_UNITS[idx]}"
 
 
 async def poll_loop():
@@ -197,17 +431,21 @@ async def poll_loop():
     while True:
         try:
             disks = get_disk_usage()
-            save_snapshot(disks)
-
-            # Notify WebSocket clients
-            msg = json.dumps({"type": "update", "disks": disks, "timestamp": datetime.now(timezone.utc).isoformat()})
-            dead = set()
-            for ws in ws_clients:
-                try:
-                    await ws.send_text(msg)
-                except:
-                    dead.add(ws)
-            ws_clients -= dead
+            await run_db(save_snapshot, disks)
+            payload = cache_current(disks, datetime.now(timezone.utc).isoformat())
+
+            # Notify WebSocket clients, unless the rounded readings are unchanged
+            readings = tuple((d["mountpoint"], d["usage_percent"]) for d in disks)
+            if readings != app.state.last_readings:
+                app.state.last_readings = readings
+                # Shared with /api/current and sent as a binary frame, so no per-client UTF-8 handling
+                clients = list(ws_clients)
+                results = await asyncio.gather(
+                    *(ws.send_bytes(payload) for ws in clients), return_exceptions=True
+                )
+                for ws, result in zip(clients, results):
+                    if isinstance(result, Exception):
+                        ws_clients.discard(ws)
 
         except Exception as e:
             print(f"Poll error: {e}", file=sys.stderr)
@@ -215,60 +453,107 @@ async def poll_loop():
         await asyncio.sleep(POLL_INTERVAL)
 
 
+async def checkpoint_loop():
+    """Background task to checkpoint the WAL on a fixed schedule."""
+    while True:
+        await asyncio.sleep(CHECKPOINT_INTERVAL)
+        try:
+            await run_db(checkpoint_db)
+        except Exception as e:
+            print(f"Checkpoint error: {e}", file=sys.stderr)
+
+
+async def retention_loop():
+    """Background task to apply the snapshot retention policy once a day."""
+    while True:
+        try:
+            await run_db(apply_retention)
+        except Exception as e:
+            print(f"Retention error: {e}", file=sys.stderr)
+        await asyncio.sleep(RETENTION_INTERVAL)
+
+
 @app.on_event("startup")
 async def startup():
-    init_db()
+    # The shared SQLite connection lives on this single worker thread, which keeps
+    # database work off the event loop and serialises it.
+    app.state.db_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="duf-db")
+    app.state.db = await run_db(open_db)
+    await run_db(init_db, app.state.db)
+    await run_db(warm_statements, app.state.db)
+    app.state.index_html = (static_dir / "index.html").read_bytes()
+    app.state.last_readings = None
     # Take initial snapshot
     disks = get_disk_usage()
-    save_snapshot(disks)
+    await run_db(save_snapshot, disks)
+    cache_current(disks, datetime.now(timezone.utc).isoformat())
     # Start background polling
-    asyncio.create_task(poll_loop())
+    app.state.tasks = [
+        asyncio.create_task(poll_loop()),
+        asyncio.create_task(checkpoint_loop()),
+        asyncio.create_task(retention_loop()),
+    ]
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Stop the background loops before the connection they use goes away
+    for task in app.state.tasks:
+        task.cancel()
+    await asyncio.gather(*app.state.tasks, return_exceptions=True)
+    await run_db(close_db)
+    app.state.db_executor.shutdown()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
-    html_file = Path(__file__).parent / "static" / "index.html"
-    return HTMLResponse(content=html_file.read_text(encoding="utf-8"))
+    return HTMLResponse(content=app.state.index_html)
 
 
 @app.get("/api/current")
-async def current_usage():
-    """Get current disk usage."""
-    disks = get_disk_usage()
-    return {
-        "hostname": HOSTNAME,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "disks": disks,
-        "alert_threshold": ALERT_THRESHOLD,
-    }
+async def current_usage(fresh: bool = Query(False)):
+    """Get current disk usage as of the last poll, or collect it now with ?fresh=1."""
+    payload = app.state.last_payload
+    if fresh:
+        disks = get_disk_usage(refresh_partitions=True)
+        payload = cache_current(disks, datetime.now(timezone.utc).isoformat())
+    return Response(content=payload, media_type="application/json")
 
 
 @app.get("/api/history/{mountpoint:path}")
-async def usage_history(mountpoint: str, hours: int = Query(24, ge=1, le=8760)):
+async def usage_history(
+    mountpoint: str,
+    hours: int = Query(24, ge=1, le=8760),
+    bins: int = Query(500, ge=1, le=5000),
+):
     """Get usage history for a specific mountpoint."""
-    history = get_history(mountpoint, hours)
-    return {"mountpoint": mountpoint, "hours": hours, "data": history}
+    rows = await run_db(get_history, mountpoint, hours, bins)
+    return Response(
+        content=dumps({
+            "mountpoint": mountpoint,
+            "hours": hours,
+            "bins": bins,
+            "data": {"columns": HISTORY_COLUMNS, "rows": rows},
+        }),
+        media_type="application/json",
+    )
 
 
 @app.get("/api/alerts")
 async def get_alerts(limit: int = Query(50, ge=1, le=500)):
     """Get recent threshold alerts."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT * FROM alerts ORDER BY id DESC LIMIT ?", (limit,)
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    rows = await run_db(fetch_alerts, limit)
+    return Response(
+        content=dumps({"columns": ALERT_COLUMNS, "rows": rows}),
+        media_type="application/json",
+    )
 
 
 @app.post("/api/alerts/{alert_id}/acknowledge")
 async def acknowledge_alert(alert_id: int):
     """Acknowledge an alert."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("UPDATE alerts SET acknowledged = 1 WHERE id = ?", (alert_id,))
-    conn.commit()
-    conn.close()
+    if not await run_db(mark_acknowledged, alert_id):
+        raise HTTPException(status_code=404, detail="Alert not found")
     return {"status": "ok"}
 
 
@@ -286,4 +571,5 @@ async def websocket_endpoint(websocket: WebSocket):
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("DUF_PORT", 8503))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Updates are small JSON frames: compressing each one costs more CPU than it saves
+    uvicorn.run(app, host="0.0.0.0", port=port, ws="websockets", ws_per_message_deflate=False)